@@ -1,9 +1,14 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
-load_dotenv()
+
+@lru_cache(maxsize=1)
+def _dotenv() -> dict[str, str]:
+    # Read once per process; Config.from_env overlays os.environ on top.
+    return {key: value for key, value in dotenv_values().items() if value is not None}
 
 
 @dataclass
@@ -15,15 +20,24 @@ class Config:
     test_interval_minutes: int = 60
     server_id: Optional[str] = None
     log_level: str = "INFO"
-    
+    server_ids: list[str] = field(default_factory=list)
+    probe_concurrency: int = 1
+
     @classmethod
     def from_env(cls) -> "Config":
+        # One snapshot of .env overlaid with the process environment, which
+        # takes precedence as it did with load_dotenv().
+        env = {**_dotenv(), **os.environ}
         return cls(
-            influxdb_url=os.getenv("INFLUXDB_URL", "http://localhost:8086"),
-            influxdb_token=os.getenv("INFLUXDB_TOKEN", ""),
-            influxdb_org=os.getenv("INFLUXDB_ORG", "speedmonitor"),
-            influxdb_bucket=os.getenv("INFLUXDB_BUCKET", "speedtest"),
-            test_interval_minutes=int(os.getenv("TEST_INTERVAL_MINUTES", "60")),
-            server_id=os.getenv("SPEEDTEST_SERVER_ID"),
-            log_level=os.getenv("LOG_LEVEL", "INFO")
-        )
\ No newline at end of file
+            influxdb_url=env.get("INFLUXDB_URL", "http://localhost:8086"),
+            influxdb_token=env.get("INFLUXDB_TOKEN", ""),
+            influxdb_org=env.get("INFLUXDB_ORG", "speedmonitor"),
+            influxdb_bucket=env.get("INFLUXDB_BUCKET", "speedtest"),
+            test_interval_minutes=int(env.get("TEST_INTERVAL_MINUTES", "60")),
+            server_id=env.get("SPEEDTEST_SERVER_ID"),
+            log_level=env.get("LOG_LEVEL", "INFO"),
+            server_ids=[
+                sid.strip() for sid in env.get("SPEEDTEST_SERVER_IDS", "").split(",") if sid.strip()
+            ],
+            probe_concurrency=int(env.get("PROBE_CONCURRENCY", "1"))
+        )
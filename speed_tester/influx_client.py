@@ -1,46 +1,200 @@
 import logging
-from influxdb_client import InfluxDBClient, Point
+import math
+import time
+from collections import deque
+from functools import cached_property
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib3 import Retry
+from influxdb_client import InfluxDBClient
 from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.domain.write_precision import WritePrecision
+from influxdb_client.rest import ApiException
 from .models import SpeedTestResult
 
+logger = logging.getLogger(__name__)
+
+# Same escaping the client's Point builder applies to tag values.
+_ESCAPE_TAG = str.maketrans({
+    ',': r'\,',
+    '=': r'\=',
+    ' ': r'\ ',
+    '\n': r'\n',
+    '\t': r'\t',
+    '\r': r'\r',
+})
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Client errors that can succeed on a later attempt; any other 4xx means
+# the server will never accept the batch.
+_RETRYABLE_CLIENT_STATUSES = frozenset({408, 429})
+
+# The schema is fixed, so each line is rendered with one bound %-format
+# call. Tags and fields are in the sorted order Point would emit.
+_format_line = "internet_speed,%s %s %d".__mod__
+
+
+def _escape_tag(value: str) -> str:
+    escaped = value.translate(_ESCAPE_TAG)
+    if escaped.endswith('\\'):
+        escaped += ' '
+    return escaped
+
+
+def _field_set(download_speed: float, ping: float, upload_speed: float) -> str:
+    # Same rules as Point: non-finite values are dropped (InfluxDB rejects
+    # nan/inf) and a trailing ".0" is trimmed from whole numbers.
+    fields = []
+    for name, value in (("download_speed", download_speed), ("ping", ping),
+                        ("upload_speed", upload_speed)):
+        value = float(value)
+        if not math.isfinite(value):
+            continue
+        rendered = repr(value)
+        if rendered.endswith('.0'):
+            rendered = rendered[:-2]
+        fields.append(f"{name}={rendered}")
+    return ",".join(fields)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, ApiException) and error.status is not None:
+        return not 400 <= error.status < 500 or error.status in _RETRYABLE_CLIENT_STATUSES
+    # Connection errors and the like.
+    return True
+
+
+def _to_seconds(timestamp: datetime) -> int:
+    # Naive timestamps are treated as UTC, matching Point.time().
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // timedelta(seconds=1)
+
 
 class InfluxDBService:
-    def __init__(self, url: str, token: str, org: str, bucket: str):
+    def __init__(self, url: str, token: str, org: str, bucket: str,
+                 batch_size: int = 5000, flush_interval_seconds: float = 10.0,
+                 max_pending: int = 50_000):
         self.url = url
         self.token = token
         self.org = org
         self.bucket = bucket
-        self.logger = logging.getLogger(__name__)
-        
-        self.client = InfluxDBClient(url=url, token=token, org=org)
-        self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
-        
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.logger = logger
+
+        # Bounded so a long outage can't grow the buffer without limit;
+        # the oldest points are dropped first.
+        self._pending: deque[str] = deque(maxlen=max(max_pending, batch_size))
+        self._last_flush = time.monotonic()
+        self._tag_key: Optional[tuple] = None
+        self._tag_set = ""
+
+    def _tags_for(self, result: SpeedTestResult) -> str:
+        # Consecutive tests usually hit the same server, so the escaped tag
+        # set is only rebuilt when the server changes.
+        key = (result.server_id, result.server_name, result.server_country)
+        if key != self._tag_key:
+            self._tag_key = key
+            self._tag_set = (
+                f"server_country={_escape_tag(result.server_country or 'unknown')},"
+                f"server_id={_escape_tag(result.server_id or 'unknown')},"
+                f"server_name={_escape_tag(result.server_name or 'unknown')}"
+            )
+        return self._tag_set
+
+    @cached_property
+    def client(self) -> InfluxDBClient:
+        # Created on first write so the monitor can start before InfluxDB is
+        # reachable. A bounded pool keeps the connection alive between
+        # writes; retries cover keep-alive sockets the server has closed.
+        # urllib3 skips POST by default, but rewriting the same series and
+        # timestamps is idempotent in InfluxDB, so writes are retried too.
+        return InfluxDBClient(
+            url=self.url,
+            token=self.token,
+            org=self.org,
+            enable_gzip=True,
+            connection_pool_maxsize=10,
+            retries=Retry(total=3, backoff_factor=0.5, allowed_methods=None)
+        )
+
+    @cached_property
+    def write_api(self):
+        # The batching WriteApi's flush() is a no-op, so points are buffered
+        # here and sent with one synchronous write per batch instead.
+        return self.client.write_api(write_options=SYNCHRONOUS)
+
+    def _append(self, result: SpeedTestResult) -> None:
+        fields = _field_set(result.download_speed, result.ping, result.upload_speed)
+        if not fields:
+            # A point without fields is not valid line protocol.
+            self.logger.warning("Skipping speed test result with no finite measurements")
+            return
+
+        line = _format_line((self._tags_for(result), fields, _to_seconds(result.timestamp)))
+        if len(self._pending) == self._pending.maxlen:
+            self.logger.warning("Pending buffer full, dropping the oldest speed test result")
+        self._pending.append(line)
+
+    def write_speed_test_results(self, results: list[SpeedTestResult]) -> None:
+        # Queue the whole cycle before flushing so it goes out in one write,
+        # however long it has been since the last flush.
+        for result in results:
+            self._append(result)
+        self.flush()
+
     def write_speed_test_result(self, result: SpeedTestResult) -> None:
+        self._append(result)
+
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval_seconds):
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+
+        lines = list(self._pending)
         try:
-            point = (
-                Point("internet_speed")
-                .tag("server_id", result.server_id or "unknown")
-                .tag("server_name", result.server_name or "unknown")
-                .tag("server_country", result.server_country or "unknown")
-                .field("download_speed", result.download_speed)
-                .field("upload_speed", result.upload_speed)
-                .field("ping", result.ping)
-                .time(result.timestamp)
+            # Tests run minutes apart, so second precision is all the
+            # timestamps need and keeps the payload smaller.
+            self.write_api.write(
+                bucket=self.bucket,
+                org=self.org,
+                record=lines,
+                write_precision=WritePrecision.S
             )
-            
-            self.write_api.write(bucket=self.bucket, org=self.org, record=point)
-            self.logger.info(f"Successfully wrote speed test result to InfluxDB: {result.timestamp}")
-            
+            self.logger.info("Successfully wrote %d speed test result(s) to InfluxDB", len(lines))
         except Exception as e:
-            self.logger.error(f"Failed to write to InfluxDB: {e}")
+            if _is_retryable(e):
+                self.logger.error("Failed to write to InfluxDB, keeping %d result(s) for retry: %s",
+                                  len(lines), e)
+            else:
+                # Resending a rejected batch would fail the same way every time.
+                self.logger.error("InfluxDB rejected %d speed test result(s), dropping them: %s",
+                                  len(lines), e)
+                self._pending.clear()
+                self._last_flush = time.monotonic()
             raise
-            
+
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+
     def close(self) -> None:
-        if self.client:
+        # Shutdown must not fail (or mask an exception already in flight)
+        # because InfluxDB is unreachable, so a failed final flush is logged.
+        try:
+            self.flush()
+        except Exception:
+            self.logger.error("Dropping %d unsent speed test result(s) on close", len(self._pending))
+            self._pending.clear()
+        if "client" in self.__dict__:
             self.client.close()
-            
+
     def __enter__(self):
         return self
-        
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
\ No newline at end of file
+        self.close()
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SpeedTestResult:
     timestamp: datetime
     download_speed: float  # Mbps
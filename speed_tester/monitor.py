@@ -1,10 +1,15 @@
+import asyncio
 import logging
-import schedule
-import time
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from .config import Config
+from .models import SpeedTestResult
 from .speed_test_service import SpeedTestService
 from .influx_client import InfluxDBService
 
+logger = logging.getLogger(__name__)
+
 
 class SpeedMonitor:
     def __init__(self, config: Config):
@@ -17,42 +22,86 @@ class SpeedMonitor:
             bucket=config.influxdb_bucket
         )
         
+        # force=True so the level applies even if something already
+        # installed root handlers; unknown level names fall back to INFO.
         logging.basicConfig(
-            level=getattr(logging, config.log_level),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            level=logging.getLevelNamesMapping().get(config.log_level.upper(), logging.INFO),
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            force=True
+        )
+        self.logger = logger
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, config.probe_concurrency),
+            thread_name_prefix="speedmonitor"
         )
-        self.logger = logging.getLogger(__name__)
         
-    def run_test_and_store(self):
+    def _run_probe(self, server_id: Optional[str]) -> Optional[SpeedTestResult]:
+        try:
+            return self.speed_test_service.run_speed_test(server_id)
+        except Exception as e:
+            self.logger.error("Speed test failed: %s", e)
+            return None
+    
+    async def run_test_and_store(self):
+        loop = asyncio.get_running_loop()
+        server_ids = self.config.server_ids or [self.config.server_id]
+        
+        self.logger.info("Running scheduled speed test...")
+        # Probes share the pool, so at most probe_concurrency run at once.
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._run_probe, server_id)
+            for server_id in server_ids
+        ))
+        results = [result for result in results if result is not None]
+        if not results:
+            return
+        
         try:
-            self.logger.info("Running scheduled speed test...")
-            result = self.speed_test_service.run_speed_test(self.config.server_id)
-            self.influx_service.write_speed_test_result(result)
+            # All of a cycle's results go out in a single write.
+            await loop.run_in_executor(
+                self._executor, self.influx_service.write_speed_test_results, results
+            )
             self.logger.info("Speed test completed and stored successfully")
         except Exception as e:
-            self.logger.error(f"Speed test failed: {e}")
+            self.logger.error("Failed to store speed test results: %s", e)
     
-    def start_monitoring(self):
-        self.logger.info(f"Starting speed monitor with {self.config.test_interval_minutes} minute intervals")
+    async def start_monitoring(self):
+        self.logger.info("Starting speed monitor with %s minute intervals", self.config.test_interval_minutes)
         
-        schedule.every(self.config.test_interval_minutes).minutes.do(self.run_test_and_store)
+        loop = asyncio.get_running_loop()
+        stop_event = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop_event.set)
         
-        self.run_test_and_store()
+        # Deadlines are absolute on the loop's monotonic clock so the time a
+        # test takes doesn't push every later test back.
+        interval = self.config.test_interval_minutes * 60
+        next_deadline = loop.time()
         
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(1)
-        except KeyboardInterrupt:
-            self.logger.info("Speed monitor stopped by user")
+            while not stop_event.is_set():
+                await self.run_test_and_store()
+                next_deadline += interval
+                if next_deadline < loop.time():
+                    # The test overran its slot; start again from now rather
+                    # than firing the missed runs back to back.
+                    next_deadline = loop.time()
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=next_deadline - loop.time())
+                except TimeoutError:
+                    pass
+            self.logger.info("Speed monitor stopped")
         finally:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            self._executor.shutdown(wait=True)
             self.influx_service.close()
 
 
 def main():
     config = Config.from_env()
     monitor = SpeedMonitor(config)
-    monitor.start_monitoring()
+    asyncio.run(monitor.start_monitoring())
 
 
 if __name__ == "__main__":
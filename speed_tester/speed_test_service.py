@@ -1,13 +1,29 @@
 import logging
+import time
 import speedtest
 from datetime import datetime
 from typing import Optional
 from .models import SpeedTestResult
 
+logger = logging.getLogger(__name__)
+
 
 class SpeedTestService:
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
+    def __init__(self, server_cache_seconds: float = 24 * 60 * 60):
+        self.logger = logger
+        self.server_cache_seconds = server_cache_seconds
+        # Selected server per requested server_id (None for auto-select),
+        # with the monotonic time it was chosen.
+        self._server_cache: dict[Optional[str], tuple[float, dict]] = {}
+        
+    def _cached_server(self, server_id: Optional[str]) -> Optional[dict]:
+        cached = self._server_cache.get(server_id)
+        if cached is None:
+            return None
+        selected_at, server = cached
+        if time.monotonic() - selected_at >= self.server_cache_seconds:
+            return None
+        return dict(server)
         
     def run_speed_test(self, server_id: Optional[str] = None) -> SpeedTestResult:
         try:
@@ -15,7 +31,12 @@ class SpeedTestService:
             
             st = speedtest.Speedtest()
             
-            if server_id:
+            # Fetching the full server list is the slow part of a run, so
+            # the chosen server is reused and only its latency re-measured.
+            cached_server = self._cached_server(server_id)
+            if cached_server:
+                st.get_best_server([cached_server])
+            elif server_id:
                 st.get_servers([server_id])
             else:
                 st.get_best_server()
@@ -30,22 +51,26 @@ class SpeedTestService:
             ping = results.ping
             
             server_info = results.server
+            self._server_cache[server_id] = (time.monotonic(), dict(server_info))
             
             result = SpeedTestResult(
-                timestamp=datetime.now(),
-                download_speed=round(download_speed, 2),
-                upload_speed=round(upload_speed, 2),
-                ping=round(ping, 2),
+                timestamp=datetime.now().replace(microsecond=0),
+                download_speed=download_speed,
+                upload_speed=upload_speed,
+                ping=ping,
                 server_id=str(server_info.get('id', '')),
                 server_name=server_info.get('name', ''),
                 server_country=server_info.get('country', '')
             )
             
-            self.logger.info(f"Speed test completed: {result.download_speed} Mbps down, "
-                           f"{result.upload_speed} Mbps up, {result.ping} ms ping")
+            self.logger.info("Speed test completed: %.2f Mbps down, %.2f Mbps up, %.2f ms ping",
+                             result.download_speed, result.upload_speed, result.ping)
             
             return result
             
         except Exception as e:
-            self.logger.error(f"Speed test failed: {e}")
+            # The cached server may be the reason the run failed, so pick
+            # a fresh one next time.
+            self._server_cache.pop(server_id, None)
+            self.logger.error("Speed test failed: %s", e)
             raise
\ No newline at end of file
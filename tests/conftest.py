@@ -0,0 +1,103 @@
+"""
+Shared fixtures for the configuration file tests.
+
+The Grafana dashboard and datasource files are read and parsed once per
+test session and shared by every test that inspects them, frozen all the
+way down (mappings become read-only proxies, lists become tuples) so no
+test can alter what the others see. The parsed
+datasource YAML is also pickled into the pytest cache, so later sessions
+(and each pytest-xdist worker) skip the YAML parse until the file changes.
+"""
+
+import json
+import os
+import pickle
+import pytest
+import yaml
+from pathlib import Path
+from types import MappingProxyType
+from typing import Optional
+from .paths import DASHBOARD_PATH, DATASOURCE_PATH
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+def _freeze(value):
+    """Recursively convert parsed JSON/YAML into read-only mappings and tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _yaml_cache_dir(config) -> Optional[Path]:
+    # config.cache is missing when run with -p no:cacheprovider. There is
+    # no shared fallback: unpickling a file another user could write would
+    # run their code, so the YAML is just parsed every session instead.
+    cache = getattr(config, "cache", None)
+    if cache is None:
+        return None
+    return cache.mkdir("parsed_yaml")
+
+
+def _load_yaml_cached(path: Path, cache_dir: Optional[Path]):
+    """Parse a YAML file, reusing the pickled result while its mtime and size are unchanged."""
+    if cache_dir is None:
+        return yaml.load(path.read_text(), Loader=_YamlLoader)
+
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    sidecar = cache_dir / f"{path.name}.pkl"
+    try:
+        cached_key, data = pickle.loads(sidecar.read_bytes())
+        if cached_key == key:
+            return data
+    except Exception:
+        # Best-effort cache: a missing, stale-format or corrupt pickle can
+        # fail in many ways, and any of them just means parse again.
+        pass
+
+    data = yaml.load(path.read_text(), Loader=_YamlLoader)
+    # Write then rename, so parallel workers never read a partial pickle
+    tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}")
+    try:
+        tmp.write_bytes(pickle.dumps((key, data), protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(tmp, sidecar)
+    except OSError:
+        pass
+    return data
+
+
+@pytest.fixture(scope="session")
+def dashboard_json():
+    """Parsed dashboard JSON, loaded once per session."""
+    try:
+        # json.loads accepts bytes directly, so skip decoding to str first
+        return _freeze(json.loads(DASHBOARD_PATH.read_bytes()))
+    except json.JSONDecodeError as e:
+        pytest.fail(f"Dashboard JSON is invalid: {e}")
+
+
+@pytest.fixture(scope="session")
+def datasource_text():
+    """Raw datasource YAML text, read once per session."""
+    return DATASOURCE_PATH.read_text()
+
+
+@pytest.fixture(scope="session")
+def datasource_parsed(request):
+    """Parsed datasource YAML, loaded once per session."""
+    try:
+        return _freeze(_load_yaml_cached(DATASOURCE_PATH, _yaml_cache_dir(request.config)))
+    except yaml.YAMLError as e:
+        pytest.fail(f"Datasource YAML is invalid: {e}")
+
+
+@pytest.fixture(scope="class")
+def parsed_configs(dashboard_json, datasource_parsed):
+    """Dashboard and datasource configs together, for cross-file checks."""
+    return dashboard_json, datasource_parsed
@@ -0,0 +1,9 @@
+"""Locations of the configuration files under test, shared by conftest and the tests."""
+
+from pathlib import Path
+
+
+# Define paths relative to project root
+PROJECT_ROOT = Path(__file__).parent.parent
+DASHBOARD_PATH = PROJECT_ROOT / "docker/grafana/dashboards/speed-monitor.json"
+DATASOURCE_PATH = PROJECT_ROOT / "docker/grafana/provisioning/datasources/influxdb.yml"
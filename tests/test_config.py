@@ -1,10 +1,11 @@
 import pytest
 from unittest.mock import patch
-from speed_tester.config import Config
+from speed_tester.config import Config, _dotenv
 
 
 def test_config_from_env_defaults():
-    with patch.dict('os.environ', {}, clear=True):
+    with patch.dict('os.environ', {}, clear=True), \
+            patch('speed_tester.config._dotenv', return_value={}):
         config = Config.from_env()
         
         assert config.influxdb_url == "http://localhost:8086"
@@ -14,6 +15,8 @@ def test_config_from_env_defaults():
         assert config.test_interval_minutes == 60
         assert config.server_id is None
         assert config.log_level == "INFO"
+        assert config.server_ids == []
+        assert config.probe_concurrency == 1
 
 
 def test_config_from_env_custom():
@@ -24,10 +27,13 @@ def test_config_from_env_custom():
         'INFLUXDB_BUCKET': 'custom-bucket',
         'TEST_INTERVAL_MINUTES': '30',
         'SPEEDTEST_SERVER_ID': '12345',
-        'LOG_LEVEL': 'DEBUG'
+        'LOG_LEVEL': 'DEBUG',
+        'SPEEDTEST_SERVER_IDS': '12345, 67890,',
+        'PROBE_CONCURRENCY': '2'
     }
     
-    with patch.dict('os.environ', env_vars, clear=True):
+    with patch.dict('os.environ', env_vars, clear=True), \
+            patch('speed_tester.config._dotenv', return_value={}):
         config = Config.from_env()
         
         assert config.influxdb_url == "http://custom:8086"
@@ -37,6 +43,43 @@ def test_config_from_env_custom():
         assert config.test_interval_minutes == 30
         assert config.server_id == "12345"
         assert config.log_level == "DEBUG"
+        assert config.server_ids == ["12345", "67890"]
+        assert config.probe_concurrency == 2
+
+
+def test_config_from_env_falls_back_to_dotenv():
+    dotenv = {
+        'INFLUXDB_URL': 'http://dotenv:8086',
+        'INFLUXDB_TOKEN': 'dotenv-token',
+    }
+    
+    with patch.dict('os.environ', {'INFLUXDB_TOKEN': 'env-token'}, clear=True), \
+            patch('speed_tester.config._dotenv', return_value=dotenv):
+        config = Config.from_env()
+        
+        assert config.influxdb_url == "http://dotenv:8086"
+        assert config.influxdb_token == "env-token"
+        assert config.influxdb_org == "speedmonitor"
+
+
+def test_config_from_env_fills_missing_keys_from_dotenv_file():
+    dotenv = {
+        'INFLUXDB_URL': 'http://localhost:8086',
+        'INFLUXDB_TOKEN': 'dotenv-token',
+        'INFLUXDB_ORG': None,
+    }
+    
+    _dotenv.cache_clear()
+    try:
+        with patch.dict('os.environ', {'INFLUXDB_URL': 'http://remote:8086'}, clear=True), \
+                patch('speed_tester.config.dotenv_values', return_value=dotenv):
+            config = Config.from_env()
+    finally:
+        _dotenv.cache_clear()
+    
+    assert config.influxdb_url == "http://remote:8086"
+    assert config.influxdb_token == "dotenv-token"
+    assert config.influxdb_org == "speedmonitor"
 
 
 def test_config_creation():
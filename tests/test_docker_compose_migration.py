@@ -15,6 +15,11 @@ import re
 from pathlib import Path
 from typing import Optional
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -23,6 +28,64 @@ STOP_SCRIPT = PROJECT_ROOT / "scripts" / "stop.sh"
 COMPOSE_FILE = PROJECT_ROOT / "docker-compose.yml"
 README_FILE = PROJECT_ROOT / "README.md"
 
+# Patterns compiled once for the whole module
+DETECTION_RE = re.compile(r'if docker compose version.*?elif command -v docker-compose', re.DOTALL)
+BASH_CODE_BLOCK_RE = re.compile(r'```bash\n(.*?)```', re.DOTALL)
+INLINE_COMPOSE_RE = re.compile(r'`([^`]*docker[- ]compose[^`]*)`')
+YAML_CODE_BLOCK_RE = re.compile(r'```ya?ml\n(.*?)```', re.DOTALL)
+COMPOSE_VERSION_RE = re.compile(r'^version:\s*["\']?3', re.MULTILINE)
+
+
+@pytest.fixture(scope="module")
+def setup_content():
+    """Contents of setup.sh, read once per module."""
+    return SETUP_SCRIPT.read_text()
+
+
+@pytest.fixture(scope="module")
+def stop_content():
+    """Contents of stop.sh, read once per module."""
+    return STOP_SCRIPT.read_text()
+
+
+@pytest.fixture(scope="module")
+def setup_lines(setup_content):
+    """setup.sh split into lines once, for the line-by-line checks."""
+    return tuple(setup_content.splitlines())
+
+
+@pytest.fixture(scope="module")
+def stop_lines(stop_content):
+    """stop.sh split into lines once, for the line-by-line checks."""
+    return tuple(stop_content.splitlines())
+
+
+@pytest.fixture(scope="module")
+def readme_content():
+    """Contents of README.md, read once per module."""
+    return README_FILE.read_text()
+
+
+@pytest.fixture(scope="module")
+def compose_content():
+    """Raw docker-compose.yml text, read once per module."""
+    return COMPOSE_FILE.read_text()
+
+
+@pytest.fixture(scope="module")
+def compose_lines(compose_content):
+    """docker-compose.yml split into lines once."""
+    return tuple(compose_content.splitlines())
+
+
+@pytest.fixture(scope="module")
+def compose_data(compose_content):
+    """Parsed docker-compose.yml, loaded once per module."""
+    try:
+        return yaml.load(compose_content, Loader=_YamlLoader)
+    except yaml.YAMLError as e:
+        pytest.fail(f"Invalid YAML: {e}")
+
 
 class TestDockerComposeDetectionLogic:
     """Test the shell script detection logic for Docker Compose versions."""
@@ -37,52 +100,45 @@ class TestDockerComposeDetectionLogic:
         assert STOP_SCRIPT.exists(), "stop.sh not found"
         assert STOP_SCRIPT.stat().st_mode & 0o111, "stop.sh is not executable"
 
-    def test_setup_script_checks_v2_first(self):
+    def test_setup_script_checks_v2_first(self, setup_content):
         """Verify setup.sh checks for V2 before V1."""
-        content = SETUP_SCRIPT.read_text()
-
         # Find the detection block
-        detection_pattern = r'if docker compose version.*?elif command -v docker-compose'
-        match = re.search(detection_pattern, content, re.DOTALL)
+        match = DETECTION_RE.search(setup_content)
 
         assert match, "Detection logic not found or incorrect order"
 
         # Verify V2 is checked first
-        assert 'docker compose version' in content, "V2 detection missing"
+        assert 'docker compose version' in setup_content, "V2 detection missing"
 
         # Verify V1 fallback exists
-        assert 'docker-compose' in content, "V1 fallback missing"
+        assert 'docker-compose' in setup_content, "V1 fallback missing"
 
         # Verify V2 comes before V1 in the file
-        v2_pos = content.find('docker compose version')
-        v1_pos = content.find('docker-compose')
+        v2_pos = setup_content.find('docker compose version')
+        v1_pos = setup_content.find('docker-compose')
         assert v2_pos < v1_pos, "V2 check should come before V1 check"
 
-    def test_stop_script_checks_v2_first(self):
+    def test_stop_script_checks_v2_first(self, stop_content):
         """Verify stop.sh checks for V2 before V1."""
-        content = STOP_SCRIPT.read_text()
-
         # Verify detection order
-        assert 'docker compose version' in content, "V2 detection missing"
-        assert 'docker-compose' in content, "V1 fallback missing"
+        assert 'docker compose version' in stop_content, "V2 detection missing"
+        assert 'docker-compose' in stop_content, "V1 fallback missing"
 
-        v2_pos = content.find('docker compose version')
-        v1_pos = content.find('docker-compose')
+        v2_pos = stop_content.find('docker compose version')
+        v1_pos = stop_content.find('docker-compose')
         assert v2_pos < v1_pos, "V2 check should come before V1 check"
 
-    def test_setup_script_has_compose_cmd_variable(self):
+    def test_setup_script_has_compose_cmd_variable(self, setup_content, setup_lines):
         """Verify setup.sh uses $COMPOSE_CMD variable throughout."""
-        content = SETUP_SCRIPT.read_text()
-
         # Should have COMPOSE_CMD definition
-        assert 'COMPOSE_CMD=' in content, "$COMPOSE_CMD variable not defined"
+        assert 'COMPOSE_CMD=' in setup_content, "$COMPOSE_CMD variable not defined"
 
         # Count uses of $COMPOSE_CMD (should be multiple)
-        compose_cmd_uses = content.count('$COMPOSE_CMD')
+        compose_cmd_uses = setup_content.count('$COMPOSE_CMD')
         assert compose_cmd_uses >= 5, f"Expected multiple uses of $COMPOSE_CMD, found {compose_cmd_uses}"
 
         # Should NOT have hardcoded docker-compose commands after detection
-        lines = content.split('\n')
+        lines = setup_lines
         in_detection_block = False
         for i, line in enumerate(lines):
             if 'Detect which Docker Compose' in line:
@@ -102,38 +158,30 @@ class TestDockerComposeDetectionLogic:
             if 'docker-compose' in line.lower() and not line.strip().startswith('echo'):
                 pytest.fail(f"Found hardcoded docker-compose after detection: {line}")
 
-    def test_stop_script_has_compose_cmd_variable(self):
+    def test_stop_script_has_compose_cmd_variable(self, stop_content):
         """Verify stop.sh uses $COMPOSE_CMD variable."""
-        content = STOP_SCRIPT.read_text()
+        assert 'COMPOSE_CMD=' in stop_content, "$COMPOSE_CMD variable not defined"
+        assert '$COMPOSE_CMD' in stop_content, "$COMPOSE_CMD variable not used"
 
-        assert 'COMPOSE_CMD=' in content, "$COMPOSE_CMD variable not defined"
-        assert '$COMPOSE_CMD' in content, "$COMPOSE_CMD variable not used"
-
-    def test_setup_script_has_deprecation_warning(self):
+    def test_setup_script_has_deprecation_warning(self, setup_content):
         """Verify setup.sh warns about V1 deprecation."""
-        content = SETUP_SCRIPT.read_text()
-
         # Should contain warning about deprecated V1
-        assert 'WARNING' in content or 'deprecated' in content.lower(), "Missing deprecation warning"
-        assert 'docker-compose V1' in content or 'upgrade' in content.lower(), "Warning should mention V1 and upgrade"
+        assert 'WARNING' in setup_content or 'deprecated' in setup_content.lower(), "Missing deprecation warning"
+        assert 'docker-compose V1' in setup_content or 'upgrade' in setup_content.lower(), "Warning should mention V1 and upgrade"
 
-    def test_setup_script_has_error_handling(self):
+    def test_setup_script_has_error_handling(self, setup_content):
         """Verify setup.sh handles missing Docker Compose properly."""
-        content = SETUP_SCRIPT.read_text()
-
         # Should check for Docker first
-        assert 'command -v docker' in content or 'docker --version' in content, "Missing Docker check"
+        assert 'command -v docker' in setup_content or 'docker --version' in setup_content, "Missing Docker check"
 
         # Should have error case for missing compose
-        assert 'ERROR' in content, "Missing error handling"
-        assert 'exit 1' in content, "Should exit on error"
+        assert 'ERROR' in setup_content, "Missing error handling"
+        assert 'exit 1' in setup_content, "Should exit on error"
 
-    def test_help_text_shows_v2_syntax(self):
+    def test_help_text_shows_v2_syntax(self, setup_lines):
         """Verify help text in setup.sh shows V2 syntax."""
-        content = SETUP_SCRIPT.read_text()
-
         # Find all echo statements
-        echo_lines = [line for line in content.split('\n') if 'echo' in line.lower()]
+        echo_lines = [line for line in setup_lines if 'echo' in line.lower()]
 
         # Count references to docker compose vs docker-compose
         v2_references = sum(1 for line in echo_lines if 'docker compose' in line)
@@ -144,21 +192,16 @@ class TestDockerComposeDetectionLogic:
 
     def test_detection_logic_syntax(self):
         """Verify detection logic has correct bash syntax."""
-        # Test setup.sh
-        result = subprocess.run(
-            ['bash', '-n', str(SETUP_SCRIPT)],
-            capture_output=True,
-            text=True
-        )
-        assert result.returncode == 0, f"setup.sh has syntax errors: {result.stderr}"
-
-        # Test stop.sh
-        result = subprocess.run(
-            ['bash', '-n', str(STOP_SCRIPT)],
-            capture_output=True,
-            text=True
-        )
-        assert result.returncode == 0, f"stop.sh has syntax errors: {result.stderr}"
+        # Each script gets its own bash -n: concatenated, an error in one
+        # file can be cancelled out by the next (e.g. an unclosed if and a
+        # stray fi).
+        for script in (SETUP_SCRIPT, STOP_SCRIPT):
+            result = subprocess.run(
+                ['bash', '-n', str(script)],
+                capture_output=True,
+                text=True
+            )
+            assert result.returncode == 0, f"{script.name} has syntax errors: {result.stderr}"
 
 
 class TestDockerComposeYAML:
@@ -168,47 +211,31 @@ class TestDockerComposeYAML:
         """Verify docker-compose.yml exists."""
         assert COMPOSE_FILE.exists(), "docker-compose.yml not found"
 
-    def test_compose_file_valid_yaml(self):
+    def test_compose_file_valid_yaml(self, compose_data):
         """Verify docker-compose.yml is valid YAML."""
-        with open(COMPOSE_FILE) as f:
-            try:
-                data = yaml.safe_load(f)
-                assert data is not None, "YAML file is empty"
-            except yaml.YAMLError as e:
-                pytest.fail(f"Invalid YAML: {e}")
-
-    def test_compose_file_no_version_field(self):
-        """Verify docker-compose.yml does not have deprecated version field."""
-        with open(COMPOSE_FILE) as f:
-            content = f.read()
-            data = yaml.safe_load(content)
+        assert compose_data is not None, "YAML file is empty"
 
+    def test_compose_file_no_version_field(self, compose_lines, compose_data):
+        """Verify docker-compose.yml does not have deprecated version field."""
         # Check the parsed data doesn't have version at root
-        assert 'version' not in data, "docker-compose.yml should not have 'version' field for V2"
+        assert 'version' not in compose_data, "docker-compose.yml should not have 'version' field for V2"
 
         # Also check raw content for version field
-        lines = content.split('\n')
-        for line in lines:
+        for line in compose_lines:
             if line.strip().startswith('version:'):
                 pytest.fail(f"Found deprecated 'version' field: {line}")
 
-    def test_compose_file_has_required_services(self):
+    def test_compose_file_has_required_services(self, compose_data):
         """Verify all required services are defined."""
-        with open(COMPOSE_FILE) as f:
-            data = yaml.safe_load(f)
-
-        assert 'services' in data, "Missing 'services' section"
+        assert 'services' in compose_data, "Missing 'services' section"
 
         required_services = ['influxdb', 'grafana', 'speedmonitor']
         for service in required_services:
-            assert service in data['services'], f"Missing required service: {service}"
+            assert service in compose_data['services'], f"Missing required service: {service}"
 
-    def test_compose_file_services_structure(self):
+    def test_compose_file_services_structure(self, compose_data):
         """Verify services have correct structure for V2."""
-        with open(COMPOSE_FILE) as f:
-            data = yaml.safe_load(f)
-
-        services = data['services']
+        services = compose_data['services']
 
         # Check influxdb service
         assert 'image' in services['influxdb'], "influxdb missing image"
@@ -222,40 +249,31 @@ class TestDockerComposeYAML:
         assert 'build' in services['speedmonitor'], "speedmonitor should be built"
         assert 'depends_on' in services['speedmonitor'], "speedmonitor should depend on influxdb"
 
-    def test_compose_file_has_volumes(self):
+    def test_compose_file_has_volumes(self, compose_data):
         """Verify volumes are properly defined."""
-        with open(COMPOSE_FILE) as f:
-            data = yaml.safe_load(f)
-
-        assert 'volumes' in data, "Missing 'volumes' section"
+        assert 'volumes' in compose_data, "Missing 'volumes' section"
 
         required_volumes = ['influxdb-data', 'influxdb-config', 'grafana-data']
         for volume in required_volumes:
-            assert volume in data['volumes'], f"Missing volume: {volume}"
+            assert volume in compose_data['volumes'], f"Missing volume: {volume}"
 
-    def test_compose_file_health_checks(self):
+    def test_compose_file_health_checks(self, compose_data):
         """Verify health checks are properly configured."""
-        with open(COMPOSE_FILE) as f:
-            data = yaml.safe_load(f)
-
         # InfluxDB should have health check
-        influxdb = data['services']['influxdb']
+        influxdb = compose_data['services']['influxdb']
         assert 'healthcheck' in influxdb, "influxdb missing healthcheck"
         assert 'test' in influxdb['healthcheck'], "influxdb healthcheck missing test"
 
         # Grafana should wait for influxdb health
-        grafana = data['services']['grafana']
+        grafana = compose_data['services']['grafana']
         if 'depends_on' in grafana:
             depends = grafana['depends_on']
             if isinstance(depends, dict) and 'influxdb' in depends:
                 assert 'condition' in depends['influxdb'], "grafana should wait for influxdb health"
 
-    def test_compose_file_restart_policies(self):
+    def test_compose_file_restart_policies(self, compose_data):
         """Verify restart policies are set for all services."""
-        with open(COMPOSE_FILE) as f:
-            data = yaml.safe_load(f)
-
-        for service_name, service in data['services'].items():
+        for service_name, service in compose_data['services'].items():
             assert 'restart' in service, f"{service_name} missing restart policy"
             assert service['restart'] in ['unless-stopped', 'always', 'on-failure'], \
                 f"{service_name} has invalid restart policy"
@@ -268,20 +286,16 @@ class TestDocumentationConsistency:
         """Verify README.md exists."""
         assert README_FILE.exists(), "README.md not found"
 
-    def test_readme_mentions_v2_requirement(self):
+    def test_readme_mentions_v2_requirement(self, readme_content):
         """Verify README mentions Docker Compose V2."""
-        content = README_FILE.read_text()
-
         # Should mention V2
-        assert 'Docker Compose V2' in content or 'docker compose' in content, \
+        assert 'Docker Compose V2' in readme_content or 'docker compose' in readme_content, \
             "README should mention Docker Compose V2"
 
-    def test_readme_command_examples_use_v2(self):
+    def test_readme_command_examples_use_v2(self, readme_content):
         """Verify README command examples use V2 syntax."""
-        content = README_FILE.read_text()
-
         # Find code blocks with docker compose commands
-        code_blocks = re.findall(r'```bash\n(.*?)```', content, re.DOTALL)
+        code_blocks = BASH_CODE_BLOCK_RE.findall(readme_content)
 
         v2_commands = 0
         v1_commands = 0
@@ -295,7 +309,7 @@ class TestDocumentationConsistency:
         assert v2_commands > 0, "README should show docker compose (V2) examples"
 
         # Check inline commands too - but exclude file references
-        inline_commands = re.findall(r'`([^`]*docker[- ]compose[^`]*)`', content)
+        inline_commands = INLINE_COMPOSE_RE.findall(readme_content)
 
         for cmd in inline_commands:
             # Skip if it's just a filename reference (ends with .yml or contains directory structure)
@@ -304,38 +318,33 @@ class TestDocumentationConsistency:
 
             if 'docker-compose' in cmd:
                 # Allow docker-compose in context of explaining compatibility
-                if 'V1' not in content[max(0, content.find(cmd) - 100):content.find(cmd) + 100]:
+                if 'V1' not in readme_content[max(0, readme_content.find(cmd) - 100):readme_content.find(cmd) + 100]:
                     pytest.fail(f"Found V1 syntax in command example: {cmd}")
 
-    def test_readme_mentions_backward_compatibility(self):
+    def test_readme_mentions_backward_compatibility(self, readme_content):
         """Verify README mentions V1 backward compatibility."""
-        content = README_FILE.read_text()
-
         # Should mention that V1 is supported/deprecated
-        has_compat_note = any(word in content.lower() for word in
+        has_compat_note = any(word in readme_content.lower() for word in
                              ['backward', 'compatibility', 'fallback', 'deprecated', 'v1 supported'])
 
         assert has_compat_note, "README should mention V1 backward compatibility"
 
-    def test_readme_no_version_in_compose_example(self):
+    def test_readme_no_version_in_compose_example(self, readme_content):
         """Verify README doesn't show version field in compose examples."""
-        content = README_FILE.read_text()
-
         # Look for yaml/yml code blocks
-        yaml_blocks = re.findall(r'```ya?ml\n(.*?)```', content, re.DOTALL)
+        yaml_blocks = YAML_CODE_BLOCK_RE.findall(readme_content)
 
         for block in yaml_blocks:
             if 'docker-compose' in block or 'services:' in block:
                 # If it looks like a compose file, check for version
-                if re.search(r'^version:\s*["\']?3', block, re.MULTILINE):
+                if COMPOSE_VERSION_RE.search(block):
                     pytest.fail(f"Found deprecated version field in YAML example: {block[:100]}")
 
-    def test_setup_script_help_output_correct(self):
+    def test_setup_script_help_output_correct(self, setup_lines):
         """Verify help output in scripts shows V2 commands."""
-        setup_content = SETUP_SCRIPT.read_text()
 
         # Find help text
-        help_lines = [line for line in setup_content.split('\n')
+        help_lines = [line for line in setup_lines
                      if 'echo' in line and ('logs' in line or 'stop' in line or 'down' in line)]
 
         for line in help_lines:
@@ -422,15 +431,12 @@ class TestCommandCompatibility:
 class TestScriptIntegration:
     """Integration tests for the migration scripts."""
 
-    def test_setup_script_dry_run(self):
+    def test_setup_script_dry_run(self, setup_content):
         """Test setup.sh detection logic with dry run."""
-        # Read the script
-        content = SETUP_SCRIPT.read_text()
-
         # Extract just the detection block
-        detection_start = content.find('# Detect which Docker Compose')
-        detection_end = content.find('fi', detection_start) + 2
-        detection_block = content[detection_start:detection_end]
+        detection_start = setup_content.find('# Detect which Docker Compose')
+        detection_end = setup_content.find('fi', detection_start) + 2
+        detection_block = setup_content[detection_start:detection_end]
 
         # Verify structure
         assert 'if docker compose version' in detection_block
@@ -438,13 +444,11 @@ class TestScriptIntegration:
         assert 'else' in detection_block
         assert 'COMPOSE_CMD=' in detection_block
 
-    def test_stop_script_dry_run(self):
+    def test_stop_script_dry_run(self, stop_content):
         """Test stop.sh detection logic with dry run."""
-        content = STOP_SCRIPT.read_text()
-
-        detection_start = content.find('# Detect which Docker Compose')
-        detection_end = content.find('fi', detection_start) + 2
-        detection_block = content[detection_start:detection_end]
+        detection_start = stop_content.find('# Detect which Docker Compose')
+        detection_end = stop_content.find('fi', detection_start) + 2
+        detection_block = stop_content[detection_start:detection_end]
 
         assert 'if docker compose version' in detection_block
         assert 'elif command -v docker-compose' in detection_block
@@ -469,14 +473,15 @@ class TestMigrationCompleteness:
                         assert 'COMPOSE_CMD' in content or 'docker compose' in content, \
                             f"{script.name} should use detection or V2 syntax"
 
-    def test_no_hardcoded_v1_in_scripts(self):
+    def test_no_hardcoded_v1_in_scripts(self, setup_content, stop_content,
+                                        setup_lines, stop_lines):
         """Verify no hardcoded docker-compose V1 commands remain."""
-        scripts = [SETUP_SCRIPT, STOP_SCRIPT]
-
-        for script in scripts:
-            content = script.read_text()
-            lines = content.split('\n')
+        scripts = {
+            SETUP_SCRIPT: (setup_content, setup_lines),
+            STOP_SCRIPT: (stop_content, stop_lines)
+        }
 
+        for script, (content, lines) in scripts.items():
             for i, line in enumerate(lines, 1):
                 # Skip comments
                 if line.strip().startswith('#'):
@@ -502,10 +507,9 @@ class TestMigrationCompleteness:
         env_example = PROJECT_ROOT / ".env.example"
         assert env_example.exists(), ".env.example required by setup.sh"
 
-    def test_validation_script_exists(self):
+    def test_validation_script_exists(self, setup_content):
         """Verify validation script referenced in setup.sh exists."""
         validate_script = PROJECT_ROOT / "scripts" / "validate-setup.sh"
 
-        setup_content = SETUP_SCRIPT.read_text()
         if 'validate-setup.sh' in setup_content:
             assert validate_script.exists(), "validate-setup.sh referenced but not found"
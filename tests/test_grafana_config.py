@@ -5,18 +5,42 @@ Tests validate:
 1. Dashboard JSON structure and UID presence
 2. Datasource YAML uses environment variable tokens
 3. Configuration file integrity and format
+
+The parsed files come from the session fixtures in conftest.py.
 """
 
-import json
+import mmap
 import re
 import pytest
-from pathlib import Path
-
-
-# Define paths relative to project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DASHBOARD_PATH = PROJECT_ROOT / "docker/grafana/dashboards/speed-monitor.json"
-DATASOURCE_PATH = PROJECT_ROOT / "docker/grafana/provisioning/datasources/influxdb.yml"
+from collections.abc import Mapping
+from .paths import DASHBOARD_PATH, DATASOURCE_PATH
+
+
+# Grafana UIDs should be alphanumeric with hyphens/underscores
+UID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]+$')
+# Common token patterns to avoid, as one alternation so the file is scanned once
+SUSPICIOUS_TOKEN_RE = re.compile(
+    r'token:\s+(?:'
+    r'[a-zA-Z0-9]{20,}'  # Long alphanumeric strings after 'token:'
+    r'|"[^$][a-zA-Z0-9_-]+"'  # Quoted strings not starting with $
+    r'|\'[^$][a-zA-Z0-9_-]+\''  # Single-quoted strings not starting with $
+    r')'
+)
+QUERY_BUCKET_RE = re.compile(r'from\(bucket:\s+"(\w+)"\)')
+# Matches both ${VAR} and bare $VAR references, told apart by the leading brace
+ENV_ANY_RE = re.compile(r'\$(\{[A-Z_]+\}|[A-Z_]+)')
+# Sensitive keywords that shouldn't appear in plain text, bare and as quoted keys
+_SENSITIVE_ALTERNATION = b'|'.join(map(re.escape, (b'password', b'secret', b'apikey', b'api_key')))
+SENSITIVE_RE = re.compile(rb'(' + _SENSITIVE_ALTERNATION + rb')', re.IGNORECASE)
+QUOTED_SENSITIVE_RE = re.compile(rb'"(' + _SENSITIVE_ALTERNATION + rb')"', re.IGNORECASE)
+
+
+def _iter_targets(dashboard):
+    """Yield (panel_id, target) for every query target in the dashboard."""
+    for panel in dashboard.get("panels", ()):
+        panel_id = panel.get("id", "unknown")
+        for target in panel.get("targets", ()):
+            yield panel_id, target
 
 
 class TestDashboardConfiguration:
@@ -26,49 +50,31 @@ class TestDashboardConfiguration:
         """Verify dashboard JSON file exists at expected location."""
         assert DASHBOARD_PATH.exists(), f"Dashboard file not found at {DASHBOARD_PATH}"
 
-    def test_dashboard_is_valid_json(self):
+    def test_dashboard_is_valid_json(self, dashboard_json):
         """Verify dashboard file is valid JSON."""
-        with open(DASHBOARD_PATH, 'r') as f:
-            try:
-                dashboard = json.load(f)
-            except json.JSONDecodeError as e:
-                pytest.fail(f"Dashboard JSON is invalid: {e}")
-
-        assert isinstance(dashboard, dict), "Dashboard should be a JSON object"
+        assert isinstance(dashboard_json, Mapping), "Dashboard should be a JSON object"
 
-    def test_dashboard_has_uid_field(self):
+    def test_dashboard_has_uid_field(self, dashboard_json):
         """Verify dashboard has a UID field defined."""
-        with open(DASHBOARD_PATH, 'r') as f:
-            dashboard = json.load(f)
+        assert "uid" in dashboard_json, "Dashboard must have a 'uid' field"
+        assert dashboard_json["uid"] is not None, "Dashboard UID cannot be null"
+        assert dashboard_json["uid"] != "", "Dashboard UID cannot be empty"
 
-        assert "uid" in dashboard, "Dashboard must have a 'uid' field"
-        assert dashboard["uid"] is not None, "Dashboard UID cannot be null"
-        assert dashboard["uid"] != "", "Dashboard UID cannot be empty"
-
-    def test_dashboard_uid_value(self):
+    def test_dashboard_uid_value(self, dashboard_json):
         """Verify dashboard UID matches expected value."""
-        with open(DASHBOARD_PATH, 'r') as f:
-            dashboard = json.load(f)
-
         expected_uid = "speedmonitor-dashboard"
-        actual_uid = dashboard["uid"]
+        actual_uid = dashboard_json["uid"]
 
         assert actual_uid == expected_uid, (
             f"Dashboard UID should be '{expected_uid}', got '{actual_uid}'"
         )
 
-    def test_dashboard_uid_format(self):
+    def test_dashboard_uid_format(self, dashboard_json):
         """Verify dashboard UID follows Grafana naming conventions."""
-        with open(DASHBOARD_PATH, 'r') as f:
-            dashboard = json.load(f)
+        uid = dashboard_json["uid"]
 
-        uid = dashboard["uid"]
-
-        # Grafana UIDs should be alphanumeric with hyphens/underscores
         # Typically 8-40 characters, no special chars except - and _
-        uid_pattern = re.compile(r'^[a-zA-Z0-9_-]+$')
-
-        assert uid_pattern.match(uid), (
+        assert UID_PATTERN.match(uid), (
             f"Dashboard UID '{uid}' contains invalid characters. "
             "Must be alphanumeric with hyphens or underscores only."
         )
@@ -77,45 +83,30 @@ class TestDashboardConfiguration:
             f"Dashboard UID '{uid}' length ({len(uid)}) should be between 3 and 40 characters"
         )
 
-    def test_dashboard_has_required_fields(self):
-        """Verify dashboard has all required top-level fields."""
-        with open(DASHBOARD_PATH, 'r') as f:
-            dashboard = json.load(f)
+    @pytest.mark.parametrize("field", ["uid", "title", "panels", "schemaVersion"])
+    def test_dashboard_has_required_field(self, dashboard_json, field):
+        """Verify dashboard has each required top-level field."""
+        assert field in dashboard_json, f"Dashboard must have '{field}' field"
 
-        required_fields = ["uid", "title", "panels", "schemaVersion"]
-
-        for field in required_fields:
-            assert field in dashboard, f"Dashboard must have '{field}' field"
-
-    def test_dashboard_panels_reference_correct_datasource(self):
+    def test_dashboard_panels_reference_correct_datasource(self, dashboard_json):
         """Verify all panels reference the correct datasource UID."""
-        with open(DASHBOARD_PATH, 'r') as f:
-            dashboard = json.load(f)
-
         expected_datasource_uid = "influxdb-datasource"
-        panels = dashboard.get("panels", [])
+        panels = dashboard_json.get("panels", [])
 
         assert len(panels) > 0, "Dashboard should have at least one panel"
 
-        for panel in panels:
-            panel_id = panel.get("id", "unknown")
-            targets = panel.get("targets", [])
-
-            for target in targets:
-                datasource = target.get("datasource", {})
-                datasource_uid = datasource.get("uid")
+        for panel_id, target in _iter_targets(dashboard_json):
+            datasource = target.get("datasource", {})
+            datasource_uid = datasource.get("uid")
 
-                assert datasource_uid == expected_datasource_uid, (
-                    f"Panel {panel_id} references datasource '{datasource_uid}', "
-                    f"expected '{expected_datasource_uid}'"
-                )
+            assert datasource_uid == expected_datasource_uid, (
+                f"Panel {panel_id} references datasource '{datasource_uid}', "
+                f"expected '{expected_datasource_uid}'"
+            )
 
-    def test_dashboard_url_predictability(self):
+    def test_dashboard_url_predictability(self, dashboard_json):
         """Verify dashboard UID enables predictable URL access."""
-        with open(DASHBOARD_PATH, 'r') as f:
-            dashboard = json.load(f)
-
-        uid = dashboard["uid"]
+        uid = dashboard_json["uid"]
 
         # Expected URL format: http://localhost:3000/d/{uid}/{slug}
         expected_url_pattern = f"/d/{uid}/"
@@ -133,190 +124,140 @@ class TestDatasourceConfiguration:
         """Verify datasource YAML file exists at expected location."""
         assert DATASOURCE_PATH.exists(), f"Datasource file not found at {DATASOURCE_PATH}"
 
-    def test_datasource_is_valid_yaml(self):
+    def test_datasource_is_valid_yaml(self, datasource_text):
         """Verify datasource file is valid YAML format."""
-        with open(DATASOURCE_PATH, 'r') as f:
-            content = f.read()
-
         # Basic YAML structure validation
-        assert "apiVersion:" in content, "YAML should have apiVersion field"
-        assert "datasources:" in content, "YAML should have datasources field"
+        assert "apiVersion:" in datasource_text, "YAML should have apiVersion field"
+        assert "datasources:" in datasource_text, "YAML should have datasources field"
 
-    def test_datasource_uses_environment_variable(self):
+    def test_datasource_uses_environment_variable(self, datasource_text):
         """Verify datasource token uses environment variable syntax."""
-        with open(DATASOURCE_PATH, 'r') as f:
-            content = f.read()
-
         # Check for environment variable syntax ${INFLUXDB_TOKEN}
-        assert "${INFLUXDB_TOKEN}" in content, (
+        assert "${INFLUXDB_TOKEN}" in datasource_text, (
             "Datasource should use ${INFLUXDB_TOKEN} environment variable syntax"
         )
 
-    def test_datasource_no_hardcoded_tokens(self):
+    def test_datasource_no_hardcoded_tokens(self, datasource_text):
         """Verify no hard-coded tokens exist in datasource configuration."""
-        with open(DATASOURCE_PATH, 'r') as f:
-            content = f.read()
-
-        # Common token patterns to avoid
-        suspicious_patterns = [
-            r'token:\s+[a-zA-Z0-9]{20,}',  # Long alphanumeric strings after 'token:'
-            r'token:\s+"[^$][a-zA-Z0-9_-]+"',  # Quoted strings not starting with $
-            r'token:\s+\'[^$][a-zA-Z0-9_-]+\'',  # Single-quoted strings not starting with $
-        ]
-
-        for pattern in suspicious_patterns:
-            matches = re.findall(pattern, content)
-            # Filter out the valid ${INFLUXDB_TOKEN} pattern
-            hardcoded = [m for m in matches if "${INFLUXDB_TOKEN}" not in m]
-
-            assert len(hardcoded) == 0, (
-                f"Found potential hard-coded token: {hardcoded}. "
-                "Use environment variable ${INFLUXDB_TOKEN} instead."
-            )
+        # Fast path: every token entry is the env-var form, so the regex
+        # cannot match anything.
+        if datasource_text.count("token:") == datasource_text.count("token: ${INFLUXDB_TOKEN}"):
+            return
+
+        matches = SUSPICIOUS_TOKEN_RE.findall(datasource_text)
+        # Filter out the valid ${INFLUXDB_TOKEN} pattern
+        hardcoded = [m for m in matches if "${INFLUXDB_TOKEN}" not in m]
+
+        assert len(hardcoded) == 0, (
+            f"Found potential hard-coded token: {hardcoded}. "
+            "Use environment variable ${INFLUXDB_TOKEN} instead."
+        )
 
-    def test_datasource_token_in_secure_section(self):
+    def test_datasource_token_in_secure_section(self, datasource_parsed):
         """Verify token is in secureJsonData section (not exposed in API)."""
-        with open(DATASOURCE_PATH, 'r') as f:
-            content = f.read()
+        datasource = datasource_parsed['datasources'][0]
 
         # Token should be under secureJsonData, not jsonData
-        lines = content.split('\n')
-        token_line_idx = None
-        secure_section_idx = None
-
-        for i, line in enumerate(lines):
-            if 'secureJsonData:' in line:
-                secure_section_idx = i
-            if 'token:' in line and '${INFLUXDB_TOKEN}' in line:
-                token_line_idx = i
-
-        assert secure_section_idx is not None, "Should have secureJsonData section"
-        assert token_line_idx is not None, "Should have token field"
-        assert token_line_idx > secure_section_idx, (
+        assert 'secureJsonData' in datasource, "Should have secureJsonData section"
+        assert 'token' in datasource['secureJsonData'], "Should have token field"
+        assert '${INFLUXDB_TOKEN}' in datasource['secureJsonData']['token'], (
             "Token should be under secureJsonData section for security"
         )
 
-    def test_datasource_has_correct_uid(self):
+    def test_datasource_has_correct_uid(self, datasource_parsed):
         """Verify datasource has the expected UID for dashboard references."""
-        with open(DATASOURCE_PATH, 'r') as f:
-            content = f.read()
-
         expected_uid = "influxdb-datasource"
 
-        assert f"uid: {expected_uid}" in content, (
+        assert datasource_parsed['datasources'][0]['uid'] == expected_uid, (
             f"Datasource should have UID '{expected_uid}' to match dashboard references"
         )
 
-    def test_datasource_configuration_structure(self):
-        """Verify datasource has required configuration fields."""
-        with open(DATASOURCE_PATH, 'r') as f:
-            content = f.read()
-
-        required_fields = [
-            "name:",
-            "type:",
-            "access:",
-            "url:",
-            "uid:",
-            "jsonData:",
-            "organization:",
-            "defaultBucket:",
-            "secureJsonData:",
-            "token:"
-        ]
-
-        for field in required_fields:
-            assert field in content, f"Datasource configuration should have '{field}' field"
-
-    def test_datasource_influxdb_settings(self):
+    @pytest.mark.parametrize("field", [
+        "name",
+        "type",
+        "access",
+        "url",
+        "uid",
+        "jsonData",
+        "organization",
+        "defaultBucket",
+        "secureJsonData",
+        "token"
+    ])
+    def test_datasource_configuration_structure(self, datasource_parsed, field):
+        """Verify datasource has each required configuration field."""
+        datasource = datasource_parsed['datasources'][0]
+        present = (
+            datasource.keys()
+            | datasource.get('jsonData', {}).keys()
+            | datasource.get('secureJsonData', {}).keys()
+        )
+
+        assert field in present, f"Datasource configuration should have '{field}' field"
+
+    def test_datasource_influxdb_settings(self, datasource_parsed):
         """Verify InfluxDB-specific settings are correct."""
-        with open(DATASOURCE_PATH, 'r') as f:
-            content = f.read()
+        datasource = datasource_parsed['datasources'][0]
+        json_data = datasource['jsonData']
 
         # Check for InfluxDB v2 (Flux) configuration
-        assert "version: Flux" in content, "Should use InfluxDB v2 (Flux)"
-        assert "organization: speedmonitor" in content, "Should reference speedmonitor org"
-        assert "defaultBucket: speedtest" in content, "Should reference speedtest bucket"
-        assert "url: http://influxdb:8086" in content, "Should reference InfluxDB container"
+        assert json_data['version'] == "Flux", "Should use InfluxDB v2 (Flux)"
+        assert json_data['organization'] == "speedmonitor", "Should reference speedmonitor org"
+        assert json_data['defaultBucket'] == "speedtest", "Should reference speedtest bucket"
+        assert datasource['url'] == "http://influxdb:8086", "Should reference InfluxDB container"
 
 
 class TestConfigurationIntegration:
     """Integration tests validating dashboard and datasource work together."""
 
-    def test_datasource_uid_matches_dashboard_references(self):
+    def test_datasource_uid_matches_dashboard_references(self, parsed_configs):
         """Verify datasource UID matches all dashboard panel references."""
-        # Load dashboard
-        with open(DASHBOARD_PATH, 'r') as f:
-            dashboard = json.load(f)
+        dashboard, datasource_config = parsed_configs
 
-        # Load datasource configuration
-        with open(DATASOURCE_PATH, 'r') as f:
-            datasource_content = f.read()
-
-        # Extract datasource UID from YAML (simple regex)
-        datasource_uid_match = re.search(r'uid:\s+([a-zA-Z0-9_-]+)', datasource_content)
-        assert datasource_uid_match, "Could not find datasource UID in YAML"
-        datasource_uid = datasource_uid_match.group(1)
+        datasource_uid = datasource_config['datasources'][0].get('uid')
+        assert datasource_uid, "Could not find datasource UID in YAML"
 
         # Check all dashboard panels reference this datasource UID
-        panels = dashboard.get("panels", [])
-
-        for panel in panels:
-            targets = panel.get("targets", [])
-            for target in targets:
-                panel_datasource_uid = target.get("datasource", {}).get("uid")
+        for panel_id, target in _iter_targets(dashboard):
+            panel_datasource_uid = target.get("datasource", {}).get("uid")
 
-                assert panel_datasource_uid == datasource_uid, (
-                    f"Panel {panel.get('id')} references '{panel_datasource_uid}', "
-                    f"but datasource UID is '{datasource_uid}'"
-                )
+            assert panel_datasource_uid == datasource_uid, (
+                f"Panel {panel_id} references '{panel_datasource_uid}', "
+                f"but datasource UID is '{datasource_uid}'"
+            )
 
-    def test_bucket_names_consistent(self):
+    def test_bucket_names_consistent(self, parsed_configs):
         """Verify bucket names are consistent between datasource and dashboard queries."""
-        # Load dashboard
-        with open(DASHBOARD_PATH, 'r') as f:
-            dashboard = json.load(f)
-
-        # Load datasource
-        with open(DATASOURCE_PATH, 'r') as f:
-            datasource_content = f.read()
+        dashboard, datasource_config = parsed_configs
 
-        # Extract bucket from datasource
-        bucket_match = re.search(r'defaultBucket:\s+(\w+)', datasource_content)
-        assert bucket_match, "Could not find defaultBucket in datasource"
-        datasource_bucket = bucket_match.group(1)
+        datasource_bucket = datasource_config['datasources'][0].get('jsonData', {}).get('defaultBucket')
+        assert datasource_bucket, "Could not find defaultBucket in datasource"
 
         # Check dashboard queries reference the same bucket
-        panels = dashboard.get("panels", [])
-
-        for panel in panels:
-            targets = panel.get("targets", [])
-            for target in targets:
-                query = target.get("query", "")
-                if query:
-                    # Extract bucket from Flux query
-                    query_bucket_match = re.search(r'from\(bucket:\s+"(\w+)"\)', query)
-                    if query_bucket_match:
-                        query_bucket = query_bucket_match.group(1)
-                        assert query_bucket == datasource_bucket, (
-                            f"Panel {panel.get('id')} queries bucket '{query_bucket}', "
-                            f"but datasource default bucket is '{datasource_bucket}'"
-                        )
-
-    def test_environment_variable_format(self):
+        for panel_id, target in _iter_targets(dashboard):
+            query = target.get("query", "")
+            if query:
+                # Extract bucket from Flux query
+                query_bucket_match = QUERY_BUCKET_RE.search(query)
+                if query_bucket_match:
+                    query_bucket = query_bucket_match.group(1)
+                    assert query_bucket == datasource_bucket, (
+                        f"Panel {panel_id} queries bucket '{query_bucket}', "
+                        f"but datasource default bucket is '{datasource_bucket}'"
+                    )
+
+    def test_environment_variable_format(self, datasource_text):
         """Verify environment variables use consistent format."""
-        with open(DATASOURCE_PATH, 'r') as f:
-            content = f.read()
-
-        # Find all environment variable references
-        env_vars = re.findall(r'\$\{([A-Z_]+)\}', content)
+        # Find all environment variable references in one pass
+        matches = ENV_ANY_RE.findall(datasource_text)
+        env_vars = [m[1:-1] for m in matches if m.startswith('{')]
 
         # Should have at least INFLUXDB_TOKEN
         assert len(env_vars) >= 1, "Should have at least one environment variable reference"
         assert "INFLUXDB_TOKEN" in env_vars, "Should reference INFLUXDB_TOKEN"
 
         # Verify format is ${VAR_NAME} not $VAR_NAME or other formats
-        invalid_formats = re.findall(r'\$[A-Z_]+(?!\{)', content)
+        invalid_formats = ['$' + m for m in matches if not m.startswith('{')]
         assert len(invalid_formats) == 0, (
             f"Found invalid environment variable format: {invalid_formats}. "
             "Use ${VAR_NAME} format."
@@ -328,37 +269,28 @@ class TestConfigurationSecurity:
 
     def test_no_credentials_in_dashboard(self):
         """Verify dashboard JSON doesn't contain any credentials."""
-        with open(DASHBOARD_PATH, 'r') as f:
-            content = f.read().lower()
+        # mmap cannot map an empty file, and there is nothing to check
+        if DASHBOARD_PATH.stat().st_size == 0:
+            return
 
-        # Sensitive keywords that shouldn't appear in plain text
-        sensitive_patterns = ['password', 'secret', 'apikey', 'api_key']
+        # Search the mapped bytes case-insensitively rather than building
+        # a lowercased copy of the whole file
+        with open(DASHBOARD_PATH, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            found = {m.group(1).lower() for m in SENSITIVE_RE.finditer(content)}
+            quoted = {m.group(1).lower() for m in QUOTED_SENSITIVE_RE.finditer(content)}
 
-        for pattern in sensitive_patterns:
-            assert pattern not in content or f'"{pattern}"' in content, (
-                f"Dashboard should not contain '{pattern}' credentials"
-            )
+        unquoted = sorted(pattern.decode() for pattern in found - quoted)
+        assert not unquoted, f"Dashboard should not contain {unquoted} credentials"
 
-    def test_datasource_token_not_in_jsondata(self):
+    def test_datasource_token_not_in_jsondata(self, datasource_parsed):
         """Verify token is not in jsonData (which is exposed via API)."""
-        with open(DATASOURCE_PATH, 'r') as f:
-            lines = f.read().split('\n')
-
-        in_jsondata = False
-        in_securejsondata = False
-
-        for line in lines:
-            if 'jsonData:' in line and 'secureJsonData' not in line:
-                in_jsondata = True
-                in_securejsondata = False
-            elif 'secureJsonData:' in line:
-                in_securejsondata = True
-                in_jsondata = False
-            elif 'token:' in line:
-                assert not in_jsondata, (
-                    "Token should not be in jsonData section (security risk). "
-                    "Use secureJsonData instead."
-                )
-                assert in_securejsondata, (
-                    "Token should be in secureJsonData section"
-                )
+        datasource = datasource_parsed['datasources'][0]
+
+        assert 'token' not in datasource.get('jsonData', {}), (
+            "Token should not be in jsonData section (security risk). "
+            "Use secureJsonData instead."
+        )
+        assert 'token' in datasource.get('secureJsonData', {}), (
+            "Token should be in secureJsonData section"
+        )
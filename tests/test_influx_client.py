@@ -1,9 +1,40 @@
+import contextlib
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import ANY, Mock, MagicMock, call
 from datetime import datetime
+from influxdb_client import Point, WritePrecision
+from influxdb_client.rest import ApiException
 from speed_tester.influx_client import InfluxDBService
 from speed_tester.models import SpeedTestResult
 
+EXPECTED_LINE = (
+    "internet_speed,server_country=US,server_id=12345,server_name=Test\\ Server "
+    "download_speed=100.5,ping=25.7,upload_speed=50.2 1672574400"
+)
+
+
+@pytest.fixture
+def mock_influx(monkeypatch):
+    mock_client_class = MagicMock()
+    monkeypatch.setattr('speed_tester.influx_client.InfluxDBClient', mock_client_class)
+    return mock_client_class
+
+
+@pytest.fixture
+def configured_influx(mock_influx):
+    mock_client = Mock()
+    mock_write_api = Mock()
+    mock_client.write_api.return_value = mock_write_api
+    mock_influx.return_value = mock_client
+    
+    service = InfluxDBService(
+        url="http://localhost:8086",
+        token="test-token",
+        org="test-org",
+        bucket="test-bucket"
+    )
+    return service, mock_write_api
+
 
 @pytest.fixture
 def speed_test_result():
@@ -18,12 +49,11 @@ def speed_test_result():
     )
 
 
-@patch('speed_tester.influx_client.InfluxDBClient')
-def test_influx_service_initialization(mock_client_class):
+def test_influx_service_initialization(mock_influx):
     mock_client = Mock()
     mock_write_api = Mock()
     mock_client.write_api.return_value = mock_write_api
-    mock_client_class.return_value = mock_client
+    mock_influx.return_value = mock_client
     
     service = InfluxDBService(
         url="http://localhost:8086",
@@ -32,87 +62,188 @@ def test_influx_service_initialization(mock_client_class):
         bucket="test-bucket"
     )
     
-    assert service.url == "http://localhost:8086"
-    assert service.token == "test-token"
-    assert service.org == "test-org"
-    assert service.bucket == "test-bucket"
-    mock_client_class.assert_called_once_with(
+    assert (service.url, service.token, service.org, service.bucket) == (
+        "http://localhost:8086", "test-token", "test-org", "test-bucket"
+    )
+    mock_influx.assert_not_called()
+    
+    assert service.client is mock_client
+    mock_influx.assert_called_once_with(
         url="http://localhost:8086",
         token="test-token",
-        org="test-org"
+        org="test-org",
+        enable_gzip=True,
+        connection_pool_maxsize=10,
+        retries=ANY
     )
+    retries = mock_influx.call_args.kwargs["retries"]
+    assert retries.total == 3
+    assert retries.backoff_factor == 0.5
+    assert retries.allowed_methods is None
 
 
-@patch('speed_tester.influx_client.InfluxDBClient')
-@patch('speed_tester.influx_client.Point')
-def test_write_speed_test_result_success(mock_point_class, mock_client_class, speed_test_result):
-    mock_client = Mock()
-    mock_write_api = Mock()
-    mock_client.write_api.return_value = mock_write_api
-    mock_client_class.return_value = mock_client
+def test_write_speed_test_result_success(configured_influx, speed_test_result):
+    service, mock_write_api = configured_influx
     
-    mock_point = Mock()
-    mock_point.tag.return_value = mock_point
-    mock_point.field.return_value = mock_point
-    mock_point.time.return_value = mock_point
-    mock_point_class.return_value = mock_point
+    service.write_speed_test_result(speed_test_result)
+    service.flush()
     
-    service = InfluxDBService(
-        url="http://localhost:8086",
-        token="test-token",
+    mock_write_api.write.assert_called_once_with(
+        bucket="test-bucket",
         org="test-org",
-        bucket="test-bucket"
+        record=[EXPECTED_LINE],
+        write_precision=WritePrecision.S
+    )
+
+
+@pytest.mark.parametrize("speeds", [
+    pytest.param({"download_speed": 100.25, "upload_speed": 50.75, "ping": 25.125}, id="fractional"),
+    pytest.param({"download_speed": 100.0, "upload_speed": 50.0, "ping": 25.0}, id="whole_numbers"),
+    pytest.param({"download_speed": 100.25, "upload_speed": float("nan"), "ping": float("inf")}, id="non_finite"),
+])
+def test_write_speed_test_result_matches_point(configured_influx, speeds):
+    service, mock_write_api = configured_influx
+    
+    result = SpeedTestResult(
+        timestamp=datetime(2023, 1, 1, 12, 0, 0, 123456),
+        server_name="Server, Town=1",
+        **speeds
     )
+    expected = (
+        Point("internet_speed")
+        .tag("server_id", "unknown")
+        .tag("server_name", "Server, Town=1")
+        .tag("server_country", "unknown")
+        .field("download_speed", result.download_speed)
+        .field("upload_speed", result.upload_speed)
+        .field("ping", result.ping)
+        .time(result.timestamp, write_precision=WritePrecision.S)
+        .to_line_protocol()
+    )
+    
+    service.write_speed_test_result(result)
+    service.flush()
+    
+    assert mock_write_api.write.call_args.kwargs["record"] == [expected]
+
+
+def test_write_speed_test_result_skips_result_without_finite_fields(configured_influx):
+    service, mock_write_api = configured_influx
+    
+    result = SpeedTestResult(
+        timestamp=datetime(2023, 1, 1, 12, 0, 0),
+        download_speed=float("nan"),
+        upload_speed=float("nan"),
+        ping=float("inf")
+    )
+    service.write_speed_test_result(result)
+    service.flush()
+    
+    mock_write_api.write.assert_not_called()
+
+
+def test_write_speed_test_result_exception(configured_influx, speed_test_result):
+    service, mock_write_api = configured_influx
+    mock_write_api.write.side_effect = Exception("Connection error")
     
     service.write_speed_test_result(speed_test_result)
     
-    mock_point_class.assert_called_once_with("internet_speed")
+    with pytest.raises(Exception, match="Connection error"):
+        service.flush()
+
+
+@pytest.mark.parametrize("error,retained", [
+    pytest.param(ApiException(status=400, reason="Bad Request"), False, id="rejected"),
+    pytest.param(ApiException(status=429, reason="Too Many Requests"), True, id="rate_limited"),
+    pytest.param(ApiException(status=503, reason="Service Unavailable"), True, id="server_error"),
+    pytest.param(ConnectionError("Connection refused"), True, id="connection_error"),
+])
+def test_flush_failure_retains_only_retryable_batches(configured_influx, speed_test_result,
+                                                      error, retained):
+    service, mock_write_api = configured_influx
+    mock_write_api.write.side_effect = error
     
-    expected_tag_calls = [
-        (("server_id", "12345"),),
-        (("server_name", "Test Server"),),
-        (("server_country", "US"),)
-    ]
-    assert mock_point.tag.call_args_list == expected_tag_calls
+    service.write_speed_test_result(speed_test_result)
+    with pytest.raises(type(error)):
+        service.flush()
     
-    expected_field_calls = [
-        (("download_speed", 100.5),),
-        (("upload_speed", 50.2),),
-        (("ping", 25.7),)
-    ]
-    assert mock_point.field.call_args_list == expected_field_calls
+    mock_write_api.write.reset_mock(side_effect=True)
+    service.flush()
+    assert mock_write_api.write.called is retained
+
+
+def test_pending_results_are_bounded(mock_influx, speed_test_result):
+    mock_write_api = mock_influx.return_value.write_api.return_value
+    mock_write_api.write.side_effect = ConnectionError("Connection refused")
     
-    mock_point.time.assert_called_once_with(speed_test_result.timestamp)
-    mock_write_api.write.assert_called_once_with(
+    service = InfluxDBService(
+        url="http://localhost:8086",
+        token="test-token",
+        org="test-org",
         bucket="test-bucket",
+        batch_size=2,
+        max_pending=3
+    )
+    for _ in range(5):
+        with contextlib.suppress(ConnectionError):
+            service.write_speed_test_result(speed_test_result)
+    
+    mock_write_api.write.reset_mock(side_effect=True)
+    service.flush()
+    assert len(mock_write_api.write.call_args.kwargs["record"]) == 3
+
+
+def test_write_speed_test_results_sends_cycle_in_one_write(mock_influx, speed_test_result):
+    mock_write_api = mock_influx.return_value.write_api.return_value
+    
+    # A zero interval would flush every single-result write on its own.
+    service = InfluxDBService(
+        url="http://localhost:8086",
+        token="test-token",
         org="test-org",
-        record=mock_point
+        bucket="test-bucket",
+        flush_interval_seconds=0
     )
+    service.write_speed_test_results([speed_test_result] * 3)
+    
+    mock_write_api.write.assert_called_once()
+    assert mock_write_api.write.call_args.kwargs["record"] == [EXPECTED_LINE] * 3
 
 
-@patch('speed_tester.influx_client.InfluxDBClient')
-def test_write_speed_test_result_exception(mock_client_class, speed_test_result):
+def test_write_speed_test_result_buffers_until_batch_size(mock_influx, speed_test_result):
     mock_client = Mock()
     mock_write_api = Mock()
-    mock_write_api.write.side_effect = Exception("Connection error")
     mock_client.write_api.return_value = mock_write_api
-    mock_client_class.return_value = mock_client
+    mock_influx.return_value = mock_client
     
     service = InfluxDBService(
         url="http://localhost:8086",
         token="test-token",
         org="test-org",
-        bucket="test-bucket"
+        bucket="test-bucket",
+        batch_size=3
     )
     
-    with pytest.raises(Exception, match="Connection error"):
-        service.write_speed_test_result(speed_test_result)
+    service.write_speed_test_result(speed_test_result)
+    service.write_speed_test_result(speed_test_result)
+    mock_write_api.write.assert_not_called()
+    
+    service.write_speed_test_result(speed_test_result)
+    service.flush()
+    
+    assert mock_write_api.write.call_args_list == [
+        call(
+            bucket="test-bucket",
+            org="test-org",
+            record=[EXPECTED_LINE] * 3,
+            write_precision=WritePrecision.S
+        )
+    ]
 
 
-@patch('speed_tester.influx_client.InfluxDBClient')
-def test_context_manager(mock_client_class):
+def test_context_manager(mock_influx):
     mock_client = Mock()
-    mock_client_class.return_value = mock_client
+    mock_influx.return_value = mock_client
     
     with InfluxDBService(
         url="http://localhost:8086",
@@ -121,5 +252,48 @@ def test_context_manager(mock_client_class):
         bucket="test-bucket"
     ) as service:
         assert service is not None
+        assert service.client is mock_client
+    
+    mock_client.close.assert_called_once()
+
+
+def test_close_survives_failed_flush(configured_influx, speed_test_result):
+    service, mock_write_api = configured_influx
+    mock_write_api.write.side_effect = ConnectionError("Connection refused")
+    
+    service.write_speed_test_result(speed_test_result)
+    service.close()
+    
+    mock_write_api.write.assert_called_once()
+    service.client.close.assert_called_once()
+
+
+def test_unused_service_never_creates_client(mock_influx):
+    service = InfluxDBService(
+        url="http://localhost:8086",
+        token="test-token",
+        org="test-org",
+        bucket="test-bucket"
+    )
+    service.flush()
+    service.close()
+    
+    mock_influx.assert_not_called()
+
+
+def test_close_flushes_pending_points(mock_influx, speed_test_result):
+    mock_client = Mock()
+    mock_write_api = Mock()
+    mock_client.write_api.return_value = mock_write_api
+    mock_influx.return_value = mock_client
+    
+    with InfluxDBService(
+        url="http://localhost:8086",
+        token="test-token",
+        org="test-org",
+        bucket="test-bucket"
+    ) as service:
+        service.write_speed_test_result(speed_test_result)
     
+    mock_write_api.write.assert_called_once()
     mock_client.close.assert_called_once()
\ No newline at end of file
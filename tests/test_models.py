@@ -1,42 +1,51 @@
+import dataclasses
 import pytest
 from datetime import datetime
 from speed_tester.models import SpeedTestResult
 
 
-def test_speed_test_result_creation():
-    timestamp = datetime.now()
-    result = SpeedTestResult(
-        timestamp=timestamp,
-        download_speed=100.5,
-        upload_speed=50.2,
-        ping=25.7,
-        server_id="12345",
-        server_name="Test Server",
-        server_country="US"
-    )
+TIMESTAMP = datetime(2023, 1, 1, 12, 0, 0)
+REQUIRED_FIELDS = {
+    "timestamp": TIMESTAMP,
+    "download_speed": 100.5,
+    "upload_speed": 50.2,
+    "ping": 25.7
+}
+SERVER_FIELDS = {
+    "server_id": "12345",
+    "server_name": "Test Server",
+    "server_country": "US"
+}
+
+
+@pytest.mark.parametrize("kwargs,expected", [
+    pytest.param(
+        {**REQUIRED_FIELDS, **SERVER_FIELDS},
+        {**REQUIRED_FIELDS, **SERVER_FIELDS},
+        id="creation"
+    ),
+    pytest.param(
+        REQUIRED_FIELDS,
+        {**REQUIRED_FIELDS, "server_id": None, "server_name": None, "server_country": None},
+        id="optional_fields"
+    ),
+])
+def test_speed_test_result(kwargs, expected):
+    result = SpeedTestResult(**kwargs)
     
-    assert result.timestamp == timestamp
-    assert result.download_speed == 100.5
-    assert result.upload_speed == 50.2
-    assert result.ping == 25.7
-    assert result.server_id == "12345"
-    assert result.server_name == "Test Server"
-    assert result.server_country == "US"
+    for name, value in expected.items():
+        assert getattr(result, name) == value, name
 
 
-def test_speed_test_result_optional_fields():
-    timestamp = datetime.now()
+def test_speed_test_result_is_frozen_and_hashable():
     result = SpeedTestResult(
-        timestamp=timestamp,
+        timestamp=datetime.now(),
         download_speed=100.5,
         upload_speed=50.2,
         ping=25.7
     )
     
-    assert result.timestamp == timestamp
-    assert result.download_speed == 100.5
-    assert result.upload_speed == 50.2
-    assert result.ping == 25.7
-    assert result.server_id is None
-    assert result.server_name is None
-    assert result.server_country is None
\ No newline at end of file
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.ping = 1.0
+    assert not hasattr(result, "__dict__")
+    assert {result: True}[result]
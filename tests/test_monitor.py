@@ -0,0 +1,140 @@
+import asyncio
+import signal
+import pytest
+from unittest.mock import MagicMock
+from datetime import datetime
+from speed_tester.config import Config
+from speed_tester.models import SpeedTestResult
+from speed_tester.monitor import SpeedMonitor
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def signal_handlers():
+    return {}
+
+
+@pytest.fixture
+def wait_timeouts(monkeypatch, clock):
+    timeouts = []
+
+    async def fake_wait_for(aw, timeout):
+        # Let the stop event win if it is already set; otherwise jump the
+        # clock to the deadline as if the wait had timed out.
+        timeouts.append(timeout)
+        task = asyncio.ensure_future(aw)
+        await asyncio.sleep(0)
+        if task.done():
+            return task.result()
+        task.cancel()
+        clock.now += timeout
+        raise TimeoutError
+
+    monkeypatch.setattr('speed_tester.monitor.asyncio.wait_for', fake_wait_for)
+    return timeouts
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monkeypatch.setattr('speed_tester.monitor.SpeedTestService', MagicMock())
+    monkeypatch.setattr('speed_tester.monitor.InfluxDBService', MagicMock())
+    # basicConfig(force=True) would remove pytest's log capture handlers.
+    monkeypatch.setattr('speed_tester.monitor.logging.basicConfig', MagicMock())
+
+    config = Config(
+        influxdb_url="http://localhost:8086",
+        influxdb_token="test-token",
+        influxdb_org="test-org",
+        influxdb_bucket="test-bucket",
+        test_interval_minutes=1
+    )
+    return SpeedMonitor(config)
+
+
+def run_monitoring(monitor, monkeypatch, clock, signal_handlers):
+    async def main():
+        loop = asyncio.get_running_loop()
+        monkeypatch.setattr(loop, "time", clock.time)
+        monkeypatch.setattr(loop, "add_signal_handler", signal_handlers.__setitem__)
+        monkeypatch.setattr(loop, "remove_signal_handler", signal_handlers.pop)
+        await monitor.start_monitoring()
+
+    asyncio.run(main())
+
+
+def fake_cycles(monitor, clock, signal_handlers, durations):
+    """Replace the speed test with one that takes the given durations, then stops."""
+    starts = []
+
+    async def fake_run_test_and_store():
+        starts.append(clock.now)
+        clock.now += durations[len(starts) - 1]
+        if len(starts) == len(durations):
+            signal_handlers[signal.SIGTERM]()
+
+    monitor.run_test_and_store = fake_run_test_and_store
+    return starts
+
+
+def test_first_run_happens_immediately(monitor, monkeypatch, clock, signal_handlers, wait_timeouts):
+    starts = fake_cycles(monitor, clock, signal_handlers, [5])
+
+    run_monitoring(monitor, monkeypatch, clock, signal_handlers)
+
+    assert starts == [1000.0]
+
+
+def test_deadlines_do_not_drift_by_test_duration(monitor, monkeypatch, clock, signal_handlers,
+                                                 wait_timeouts):
+    starts = fake_cycles(monitor, clock, signal_handlers, [5, 5, 5])
+
+    run_monitoring(monitor, monkeypatch, clock, signal_handlers)
+
+    assert starts == [1000.0, 1060.0, 1120.0]
+    assert wait_timeouts[:2] == [55.0, 55.0]
+
+
+def test_overrun_resets_deadline_to_now(monitor, monkeypatch, clock, signal_handlers, wait_timeouts):
+    starts = fake_cycles(monitor, clock, signal_handlers, [90, 5, 5])
+
+    run_monitoring(monitor, monkeypatch, clock, signal_handlers)
+
+    # The missed 1060 slot is skipped rather than run straight after.
+    assert starts == [1000.0, 1090.0, 1150.0]
+    assert wait_timeouts[:2] == [0.0, 55.0]
+
+
+def test_stop_event_ends_loop_and_closes_influx(monitor, monkeypatch, clock, signal_handlers,
+                                                wait_timeouts):
+    result = SpeedTestResult(
+        timestamp=datetime(2023, 1, 1, 12, 0, 0),
+        download_speed=100.5,
+        upload_speed=50.2,
+        ping=25.7
+    )
+    monitor.speed_test_service.run_speed_test.return_value = result
+    monitor.config.server_ids = ["1", "2", "3"]
+
+    def stop_after_store(results):
+        signal_handlers[signal.SIGINT]()
+
+    monitor.influx_service.write_speed_test_results.side_effect = stop_after_store
+
+    run_monitoring(monitor, monkeypatch, clock, signal_handlers)
+
+    assert monitor.speed_test_service.run_speed_test.call_count == 3
+    monitor.influx_service.write_speed_test_results.assert_called_once_with([result] * 3)
+    monitor.influx_service.close.assert_called_once()
+    assert signal_handlers == {}
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, MagicMock
 from datetime import datetime
 from speed_tester.speed_test_service import SpeedTestService
 from speed_tester.models import SpeedTestResult
@@ -10,7 +10,13 @@ def speed_test_service():
     return SpeedTestService()
 
 
-@patch('speed_tester.speed_test_service.speedtest.Speedtest')
+@pytest.fixture
+def mock_speedtest_class(monkeypatch):
+    mock_class = MagicMock()
+    monkeypatch.setattr('speed_tester.speed_test_service.speedtest.Speedtest', mock_class)
+    return mock_class
+
+
 def test_run_speed_test_success(mock_speedtest_class, speed_test_service):
     mock_speedtest = Mock()
     mock_speedtest_class.return_value = mock_speedtest
@@ -37,13 +43,13 @@ def test_run_speed_test_success(mock_speedtest_class, speed_test_service):
     assert result.server_name == "Test Server"
     assert result.server_country == "US"
     assert isinstance(result.timestamp, datetime)
+    assert result.timestamp.microsecond == 0
     
     mock_speedtest.get_best_server.assert_called_once()
     mock_speedtest.download.assert_called_once()
     mock_speedtest.upload.assert_called_once()
 
 
-@patch('speed_tester.speed_test_service.speedtest.Speedtest')
 def test_run_speed_test_with_server_id(mock_speedtest_class, speed_test_service):
     mock_speedtest = Mock()
     mock_speedtest_class.return_value = mock_speedtest
@@ -66,9 +72,107 @@ def test_run_speed_test_with_server_id(mock_speedtest_class, speed_test_service)
     mock_speedtest.get_best_server.assert_not_called()
 
 
-@patch('speed_tester.speed_test_service.speedtest.Speedtest')
+def test_run_speed_test_keeps_full_precision(mock_speedtest_class, speed_test_service):
+    mock_speedtest = Mock()
+    mock_speedtest_class.return_value = mock_speedtest
+    
+    mock_speedtest.download.return_value = 123_456_789
+    mock_speedtest.upload.return_value = 98_765_432
+    
+    mock_results = Mock()
+    mock_results.ping = 12.3456
+    mock_results.server = {
+        'id': '12345',
+        'name': 'Test Server',
+        'country': 'US'
+    }
+    mock_speedtest.results = mock_results
+    
+    result = speed_test_service.run_speed_test()
+    
+    assert result.download_speed == 123.456789
+    assert result.upload_speed == 98.765432
+    assert result.ping == 12.3456
+
+
 def test_run_speed_test_exception(mock_speedtest_class, speed_test_service):
     mock_speedtest_class.side_effect = Exception("Network error")
     
     with pytest.raises(Exception, match="Network error"):
-        speed_test_service.run_speed_test()
\ No newline at end of file
+        speed_test_service.run_speed_test()
+
+
+def test_run_speed_test_reuses_selected_server(mock_speedtest_class, speed_test_service):
+    mock_speedtest = Mock()
+    mock_speedtest_class.return_value = mock_speedtest
+    
+    mock_speedtest.download.return_value = 100_000_000
+    mock_speedtest.upload.return_value = 50_000_000
+    
+    mock_results = Mock()
+    mock_results.ping = 25.5
+    mock_results.server = {
+        'id': '12345',
+        'name': 'Test Server',
+        'country': 'US'
+    }
+    mock_speedtest.results = mock_results
+    
+    speed_test_service.run_speed_test()
+    mock_speedtest.get_best_server.assert_called_once_with()
+    
+    speed_test_service.run_speed_test()
+    mock_speedtest.get_best_server.assert_called_with([mock_results.server])
+    mock_speedtest.get_servers.assert_not_called()
+
+
+def test_run_speed_test_forgets_server_after_failure(mock_speedtest_class, speed_test_service):
+    mock_speedtest = Mock()
+    mock_speedtest_class.return_value = mock_speedtest
+    
+    mock_speedtest.download.return_value = 100_000_000
+    mock_speedtest.upload.return_value = 50_000_000
+    
+    mock_results = Mock()
+    mock_results.ping = 25.5
+    mock_results.server = {
+        'id': '12345',
+        'name': 'Test Server',
+        'country': 'US'
+    }
+    mock_speedtest.results = mock_results
+    
+    speed_test_service.run_speed_test()
+    
+    mock_speedtest.download.side_effect = Exception("Server offline")
+    with pytest.raises(Exception, match="Server offline"):
+        speed_test_service.run_speed_test()
+    
+    mock_speedtest.download.side_effect = None
+    mock_speedtest.get_best_server.reset_mock()
+    speed_test_service.run_speed_test()
+    mock_speedtest.get_best_server.assert_called_once_with()
+
+
+def test_run_speed_test_refreshes_expired_server(mock_speedtest_class):
+    service = SpeedTestService(server_cache_seconds=0)
+    mock_speedtest = Mock()
+    mock_speedtest_class.return_value = mock_speedtest
+    
+    mock_speedtest.download.return_value = 100_000_000
+    mock_speedtest.upload.return_value = 50_000_000
+    
+    mock_results = Mock()
+    mock_results.ping = 25.5
+    mock_results.server = {
+        'id': '67890',
+        'name': 'Specific Server',
+        'country': 'CA'
+    }
+    mock_speedtest.results = mock_results
+    
+    service.run_speed_test(server_id="67890")
+    service.run_speed_test(server_id="67890")
+    
+    assert mock_speedtest.get_servers.call_count == 2
+    mock_speedtest.get_best_server.assert_not_called()